@@ -1,10 +1,10 @@
 # eye_widget.py
 
 import time
-import cv2
 import mediapipe as mp
 import numpy as np
 import pyautogui
+from numba import njit
 
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton,
@@ -12,7 +12,60 @@ from PyQt5.QtWidgets import (
     QDoubleSpinBox, QSpinBox
 )
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QImage, QPixmap
+
+from inference_worker import InferenceWorker, PreviewState, show_bgr, SCREEN_W, SCREEN_H
+
+# ─ Per-frame numeric kernels (compiled by numba) ─
+
+@njit(cache=True, fastmath=True)
+def _dist(b, i, j):
+    dx = b[i,0] - b[j,0]
+    dy = b[i,1] - b[j,1]
+    return (dx*dx + dy*dy)**0.5
+
+@njit(cache=True, fastmath=True)
+def _ear_kernel(b):
+    # mean EAR of both eyes; rows 0-5 of b are the left eye, 6-11 the right
+    ear = 0.0
+    for o in range(0, 12, 6):
+        c = _dist(b, o, o+3)
+        if c > 0:
+            ear += (_dist(b, o+1, o+5) + _dist(b, o+2, o+4)) / (2*c)
+    return 0.5*ear
+
+@njit(cache=True, fastmath=True)
+def _map_kernel(ix, iy, minx, miny, maxx, maxy, inv_x, inv_y, sw1, sh1):
+    # inv_x/inv_y are 1/(max-min), or 0 when the calibration range is empty
+    ix = max(minx, min(maxx, ix))
+    iy = max(miny, min(maxy, iy))
+    rx = (ix - minx) * inv_x if inv_x else 0.5
+    ry = (iy - miny) * inv_y if inv_y else 0.5
+    return int(rx * sw1), int(ry * sh1)
+
+@njit(cache=True, fastmath=True)
+def _des_update(S, tx, ty, a):
+    # double exponential smoothing step; S[0] is S1, S[1] is S2, updated in place
+    S[0,0] = a*tx     + (1-a)*S[0,0]
+    S[0,1] = a*ty     + (1-a)*S[0,1]
+    S[1,0] = a*S[0,0] + (1-a)*S[1,0]
+    S[1,1] = a*S[0,1] + (1-a)*S[1,1]
+
+@njit(cache=True, fastmath=True)
+def _des_forecast(S, k, sw1, sh1):
+    # (2+k)·S1 − (1+k)·S2 with trend gain k, clamped to the screen
+    x = (2+k)*S[0,0] - (1+k)*S[1,0]
+    y = (2+k)*S[0,1] - (1+k)*S[1,1]
+    return int(min(max(x, 0.0), sw1)), int(min(max(y, 0.0), sh1))
+
+def _warm_kernels():
+    # compile (or load from numba's cache) every kernel with the argument
+    # types used at runtime, so none of them compiles mid-session
+    b = np.zeros((12,2), np.float32)
+    S = np.zeros((2,2))
+    _ear_kernel(b)
+    _map_kernel(0.5, 0.5, 0.0, 0.0, 1.0, 1.0, 1.0, 1.0, 1, 1)
+    _des_update(S, 0.0, 0.0, 0.3)
+    _des_forecast(S, 0.5, 1, 1)
 
 class EyeTrackerWidget(QWidget):
     calibration_complete = pyqtSignal()
@@ -25,6 +78,7 @@ class EyeTrackerWidget(QWidget):
         self.calibrated = False
         self.calibration_points = []
         self.calibration_step = 0
+        self._map_args = None  # cached by _on_calibrated for _map_kernel
         self.instructions = [
             "Look at TOP‑LEFT and double‑blink",
             "Look at TOP‑RIGHT and double‑blink",
@@ -36,9 +90,11 @@ class EyeTrackerWidget(QWidget):
         # ─ Blink detection ───────────────────────────────
         self.LEFT_EYE  = [33,160,158,133,153,144]
         self.RIGHT_EYE = [362,385,387,263,373,380]
+        self._eye_ids  = np.array(self.LEFT_EYE + self.RIGHT_EYE, dtype=np.int32)
+        self._ear_buf  = np.empty((12,2), np.float32)
         self.blink_thresh = 0.21
         self.is_blinking = False
-        self.blink_times = []
+        self._bt0 = self._bt1 = 0.0  # previous and latest blink times
         self.double_window = 0.5
         self.last_blink = 0
         self.ignore_after_blink = 0.3
@@ -47,9 +103,17 @@ class EyeTrackerWidget(QWidget):
         self.smoothed = None
         self.move_thr = 20
         self.alpha    = 0.3
+        # double exponential smoothing state (LaViola); lam=1 predicts one frame ahead
+        self._S = np.empty((2,2))  # rows: S1, S2
+        self._S_ready = False
+        self.lam = 1.0
+        self.k_max = 1.0  # cap on the trend gain a/(1-a)·lam, so high α can't fling the cursor
+        self._gliding = False  # cursor still moving when the last inference ran
+        self._stale   = 0      # frames since that inference
         self.dwell    = 1.0
         self.dwell_ts = 0
         self.last_click = 0
+        self._last_move_ts = 0  # moves closer than 20 ms apart are dropped
 
         # ─ UI setup ───────────────────────────────────────
         self.instruction_label = QLabel(self.instructions[0], alignment=Qt.AlignCenter)
@@ -65,60 +129,101 @@ class EyeTrackerWidget(QWidget):
         layout.addWidget(self.recalib_btn)
         layout.addWidget(self.settings_btn)
 
-        # ─ Frame update timer ─────────────────────────────
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._update)
+        # ─ Capture + inference runs on a worker thread ───
+        self.worker = None
+
+        # ─ Preview fallback buffer (Qt without BGR888) ──
+        self._preview = PreviewState()
+        self._preview_skip = 0  # repaint the preview on every other frame
 
         # ─ after calibration, shrink the preview ─────────
         self.calibration_complete.connect(self._on_calibrated)
 
+    @property
+    def move_thr(self):
+        return self._move_thr
+
+    @move_thr.setter
+    def move_thr(self, v):
+        # the per-frame dwell test compares squared distances
+        self._move_thr = v
+        self._move_thr_sq = v*v
+
     def start_tracking(self):
-        self.cap = cv2.VideoCapture(0)
-        self.face_mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True)
-        self.timer.start(30)
+        _warm_kernels()
+        self.worker = InferenceWorker(
+            lambda: mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=True,  # landmark 468 (iris) only exists when refined
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        )
+        self.worker.start(self, self._on_result)
 
     def stop_tracking(self):
-        self.timer.stop()
-        if hasattr(self, 'cap') and self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.worker:
+            self.worker.shutdown()
+            self.worker = None
 
     def _get_iris(self, lm):
         p = lm[468]
         return p.x, p.y
 
     def _map(self, ix, iy):
-        pts = self.calibration_points[:4]
-        minx, maxx = min(p[0] for p in pts), max(p[0] for p in pts)
-        miny, maxy = min(p[1] for p in pts), max(p[1] for p in pts)
-        ix = max(minx, min(maxx, ix))
-        iy = max(miny, min(maxy, iy))
-        # invert horizontal so head-left → cursor-left
-        rx = (ix - minx) / (maxx - minx) if maxx != minx else 0.5
-        ry =     (iy - miny) / (maxy - miny) if maxy != miny else 0.5
-        sw, sh = pyautogui.size()
-        return int(rx * (sw - 1)), int(ry * (sh - 1))
-
-    def _ear(self, lm, ids):
-        pts = [lm[i] for i in ids]
-        A = np.linalg.norm([pts[1].x-pts[5].x, pts[1].y-pts[5].y])
-        B = np.linalg.norm([pts[2].x-pts[4].x, pts[2].y-pts[4].y])
-        C = np.linalg.norm([pts[0].x-pts[3].x, pts[0].y-pts[3].y])
-        return (A+B)/(2*C) if C else 0
-
-    def _update(self):
-        ret, frame = self.cap.read()
-        if not ret:
+        return _map_kernel(ix, iy, *self._map_args)
+
+    def _smooth(self, tx, ty):
+        if not self._S_ready:
+            # seed from the current cursor so the first move after a blink is smoothed too
+            sx, sy = self.smoothed if self.smoothed is not None else (tx, ty)
+            self._S[:,0] = sx
+            self._S[:,1] = sy
+            self._S_ready = True
+        _des_update(self._S, float(tx), float(ty), self.alpha)
+        return self._predict(self.lam)
+
+    def _predict(self, tau):
+        # forecast tau inference steps ahead of the smoothed state
+        a = self.alpha
+        k = min(a/(1-a)*tau, self.k_max)
+        return _des_forecast(self._S, k, SCREEN_W - 1, SCREEN_H - 1)
+
+    def _move(self, sx, sy, now):
+        # self.smoothed tracks where the cursor really is, so a move dropped
+        # by the 20 ms gate must not advance it
+        if now - self._last_move_ts < 0.02:
             return
+        self._last_move_ts = now
+        self.smoothed = (sx, sy)
+        pyautogui.moveTo(sx, sy, _pause=False)
 
-        frame = cv2.flip(frame, 1)  # mirror so it feels natural
-        rgb   = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res   = self.face_mesh.process(rgb)
-        now   = time.time()
+    def _ears(self, lm):
+        b = self._ear_buf
+        for k, i in enumerate(self._eye_ids):
+            p = lm[i]; b[k,0] = p.x; b[k,1] = p.y
+        return _ear_kernel(b)
 
-        if res.multi_face_landmarks:
+    def _on_result(self, frame, res, fresh):
+        # runs on the GUI thread; inference already happened in the worker
+        now = time.time()
+        self._stale = 0 if fresh else self._stale + 1
+        if fresh:
+            # only the move branch below re‑arms the glide; no face, not yet
+            # calibrated, the post‑blink window and dwell all stop it
+            self._gliding = False
+
+        if not fresh:
+            # landmarks are reused from the last inference; extrapolate the
+            # smoother's trend by the fraction of an inference step elapsed,
+            # without feeding the old target in again as a new observation
+            if self._gliding:
+                tau = self.lam + self._stale / self.worker.infer_every
+                self._move(*self._predict(tau), now)
+        elif res.multi_face_landmarks:
             lm  = res.multi_face_landmarks[0].landmark
-            ear = (self._ear(lm,self.LEFT_EYE) + self._ear(lm,self.RIGHT_EYE)) / 2
+            ear = self._ears(lm)
 
             # detect blink edge
             if ear < self.blink_thresh and not self.is_blinking:
@@ -126,15 +231,13 @@ class EyeTrackerWidget(QWidget):
             elif ear >= self.blink_thresh and self.is_blinking:
                 self.is_blinking = False
                 self.last_blink = now
+                self._S_ready = False
 
                 if not self.calibrated:
                     # double blink → calibration
-                    self.blink_times.append(now)
-                    if len(self.blink_times) > 2:
-                        self.blink_times.pop(0)
-                    if (len(self.blink_times)==2 and
-                        self.blink_times[1]-self.blink_times[0]<self.double_window):
-                        self.blink_times.clear()
+                    self._bt0, self._bt1 = self._bt1, now
+                    if self._bt0 > 0 and self._bt1 - self._bt0 < self.double_window:
+                        self._bt0 = self._bt1 = 0.0
                         ix, iy = self._get_iris(lm)
                         self.calibration_points.append((ix, iy))
                         self.calibration_step += 1
@@ -146,7 +249,7 @@ class EyeTrackerWidget(QWidget):
                             self.calibration_complete.emit()
                 else:
                     # after calibration, single blink → click
-                    pyautogui.click()
+                    QTimer.singleShot(0, lambda: pyautogui.click(_pause=False))
 
             # gaze → cursor & dwell, skip immediately after blink
             if self.calibrated and (now - self.last_blink) > self.ignore_after_blink:
@@ -156,29 +259,29 @@ class EyeTrackerWidget(QWidget):
                     self.smoothed, self.dwell_ts = (tx, ty), now
                 else:
                     dx, dy = tx - self.smoothed[0], ty - self.smoothed[1]
-                    dist = (dx*dx + dy*dy)**0.5
-                    if dist < self.move_thr:
+                    d2 = dx*dx + dy*dy
+                    if d2 < self._move_thr_sq:
                         if now - self.dwell_ts > self.dwell and now - self.last_click > self.dwell:
-                            pyautogui.click()
+                            QTimer.singleShot(0, lambda: pyautogui.click(_pause=False))
                             self.last_click = now
                     else:
                         self.dwell_ts = now
-                        α = min(0.85, max(self.alpha, dist/300))
-                        sx = int(α*tx + (1-α)*self.smoothed[0])
-                        sy = int(α*ty + (1-α)*self.smoothed[1])
-                        self.smoothed = (sx, sy)
-                        pyautogui.moveTo(sx, sy, duration=0.08)
+                        self._gliding = True
+                        self._move(*self._smooth(tx, ty), now)
 
-        # show preview
-        h, w, _ = frame.shape
-        img = QImage(frame.data, w, h, 3*w, QImage.Format_RGB888).rgbSwapped()
-        self.video_label.setPixmap(QPixmap.fromImage(img))
+        # show preview, at half the inference rate
+        self._preview_skip = (self._preview_skip+1) % 2
+        if self._preview_skip:
+            show_bgr(self.video_label, frame, self._preview)
 
     def start_recalib(self):
         self.calibrated = False
         self.calibration_points.clear()
         self.calibration_step = 0
+        self._map_args = None
         self.smoothed = None
+        self._S_ready = False
+        self._gliding = False
         self.instruction_label.setText(self.instructions[0])
 
     def open_settings(self):
@@ -199,6 +302,17 @@ class EyeTrackerWidget(QWidget):
         dlg.exec_()
 
     def _on_calibrated(self):
+        # the corner bounds and screen size are fixed until the next re‑calibration
+        pts = np.array(self.calibration_points[:4])
+        mnx, mny = pts.min(0)
+        mxx, mxy = pts.max(0)
+        self._map_args = (
+            mnx, mny, mxx, mxy,
+            1.0/(mxx-mnx) if mxx != mnx else 0.0,
+            1.0/(mxy-mny) if mxy != mny else 0.0,
+            SCREEN_W - 1, SCREEN_H - 1,
+        )
+
         # shrink the preview widget down into a corner
         self.video_label.setFixedSize(200, 150)
         self.video_label.setScaledContents(True)
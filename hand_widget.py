@@ -6,48 +6,81 @@ import numpy as np
 import pyautogui
 
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout
-from PyQt5.QtCore    import Qt, QTimer
-from PyQt5.QtGui     import QImage, QPixmap
+from PyQt5.QtCore    import Qt
+
+from inference_worker import InferenceWorker, PreviewState, show_bgr, SCREEN_W, SCREEN_H
+
+_TIPS = (4, 8, 12)  # thumb, index, middle fingertip landmarks
+
+def _lm_xy(lm, idxs, out):
+    # copy the normalised x/y of the given landmarks into out, row by row
+    for k, i in enumerate(idxs):
+        p = lm.landmark[i]; out[k,0] = p.x; out[k,1] = p.y
 
 class ClickController:
     def __init__(self):
         self.down = False
-        self.thresh = 40
+        self.thresh = 40  # px; also sets the press/release thresholds
+        self._d_ema = None  # low-passed thumb–index distance
         self.scroll_mode = False
         self.last_y = None
 
+    @property
+    def thresh(self):
+        return self._thresh
+
+    @thresh.setter
+    def thresh(self, v):
+        # hysteresis: press below 0.9·thresh, release above 1.1·thresh
+        self._thresh = v
+        self._press_thr = 0.9*v
+        self._release_thr = 1.1*v
+
     def update(self, thumb_pos, index_pos):
-        d = np.hypot(thumb_pos[0]-index_pos[0], thumb_pos[1]-index_pos[1])
+        dx = thumb_pos[0]-index_pos[0]
+        dy = thumb_pos[1]-index_pos[1]
+        d = (dx*dx + dy*dy)**0.5
+        self._d_ema = d if self._d_ema is None else 0.5*d + 0.5*self._d_ema
         prev = self.down
-        self.down = d < self.thresh
+        self.down = self._d_ema < (self._release_thr if prev else self._press_thr)
         
         # Handle regular clicking
         if self.down and not prev:
-            pyautogui.mouseDown()
+            pyautogui.mouseDown(_pause=False)
         elif not self.down and prev:
-            pyautogui.mouseUp()
+            pyautogui.mouseUp(_pause=False)
         
         # Removed reset of scroll state to fix scrolling
         # self.scroll_mode = False
         # self.last_y = None
+
+    def release(self):
+        # lift any held click and forget the filtered distance
+        if self.down:
+            pyautogui.mouseUp(_pause=False)
+        self.down = False
+        self._d_ema = None
             
-    def update_with_landmarks(self, tp, ip, landmarks):
+    def update_with_landmarks(self, tp, ip, tips):
+        # tips: (3,2) normalised thumb/index/middle fingertips, see _lm_xy
         # First process basic click detection
         self.update(tp, ip)
         
         # Check if pointer and middle fingers are pinched for scrolling
-        pointer_tip = landmarks.landmark[8]
-        middle_tip = landmarks.landmark[12]
-        pinch_distance = np.hypot(pointer_tip.x - middle_tip.x, pointer_tip.y - middle_tip.y)
+        pointer_tip = tips[1]
+        middle_tip = tips[2]
+        px = pointer_tip[0] - middle_tip[0]
+        py = pointer_tip[1] - middle_tip[1]
+        pinch_distance_sq = px*px + py*py
         
-        if pinch_distance < 0.05:  # Changed from 50 to 0.05 for normalized coordinates
+        if pinch_distance_sq < 0.0025:  # 0.05**2, normalized coordinates
             # We're in scroll mode - use the position of the paired fingers for scrolling
             if self.last_y is None:
-                self.last_y = (pointer_tip.y + middle_tip.y) / 2
+                self.last_y = (pointer_tip[1] + middle_tip[1]) / 2
                 self.scroll_mode = True
             else:
                 # Get current y position of the pinched fingers
-                current_y = (pointer_tip.y + middle_tip.y) / 2
+                current_y = (pointer_tip[1] + middle_tip[1]) / 2
                 
                 # Calculate movement since last frame
                 y_diff = current_y - self.last_y
@@ -57,21 +90,21 @@ class ClickController:
                 
                 # Apply scrolling - negative because moving hand down should scroll down
                 if abs(scroll_amount) > 1:  # Add threshold to avoid tiny movements
-                    pyautogui.scroll(-scroll_amount)
+                    pyautogui.scroll(-scroll_amount, _pause=False)
                 
                 # Update last position
                 self.last_y = current_y
             
             # Temporarily suppress clicks during scroll without disrupting click state
             if self.down:
-                pyautogui.mouseUp()  # Release temporarily while scrolling
+                pyautogui.mouseUp(_pause=False)  # Release temporarily while scrolling
                 
             self.scroll_mode = True
         else:
             # Not in scroll mode anymore
             if self.scroll_mode and self.down:
                 # Restore mouse down state if needed when exiting scroll mode
-                pyautogui.mouseDown()
+                pyautogui.mouseDown(_pause=False)
             
             # Reset scroll state
             if self.scroll_mode:
@@ -84,80 +117,86 @@ class HandTrackerWidget(QWidget):
         self.video = QLabel(alignment=Qt.AlignCenter)
         QVBoxLayout(self).addWidget(self.video)
 
-        pyautogui.FAILSAFE = False
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._frame)
+        self.worker = None
+        self._preview = PreviewState()
 
         self.ctrl = ClickController()
-        self.screen_w, self.screen_h = pyautogui.size()
+        self._lm_buf = np.empty((3,2), np.float32)  # rows follow _TIPS
+        # skeleton overlay: landmark pixel coords + connection index pairs
+        self._hand_pts = np.empty((21,2), np.int32)
+        self._hand_conn = np.array(sorted(mp.solutions.hands.HAND_CONNECTIONS), np.int32)
 
     def start_tracking(self):
-        self.cap = cv2.VideoCapture(0)
-        self.hands = mp.solutions.hands.Hands(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+        self.worker = InferenceWorker(
+            lambda: mp.solutions.hands.Hands(
+                static_image_mode=False,
+                max_num_hands=2,
+                model_complexity=0,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            ),
+            emit_stale=False  # gestures and overlay need fresh landmarks
         )
-        self.timer.start(30)
+        # emit_stale=False: every delivered frame is fresh, so drop the flag
+        self.worker.start(self, lambda fr, res, fresh: self._frame(fr, res))
 
     def stop_tracking(self):
-        self.timer.stop()
-        if hasattr(self, 'cap') and self.cap:
-            self.cap.release()
-            self.cap = None
-
-    def _frame(self):
-        ret, fr = self.cap.read()
-        if not ret:
-            return
-
-        fr = cv2.flip(fr, 1)  # mirror so it matches the eye‑tracker
+        if self.worker:
+            self.worker.shutdown()
+            self.worker = None
+
+    def _draw_hand(self, fr, lm, w, h):
+        # one cv2 call for the whole skeleton instead of draw_landmarks
+        pts = self._hand_pts
+        for k, p in enumerate(lm.landmark):
+            pts[k,0] = p.x*w; pts[k,1] = p.y*h
+        cv2.polylines(fr, pts[self._hand_conn], False, (0,255,0), 1)
+
+    def _frame(self, fr, res):
+        # fr is already mirrored by the worker so it matches the eye‑tracker;
+        # only fresh frames arrive here (emit_stale=False), i.e. every
+        # infer_every‑th camera frame, so the preview runs at that rate too
         h, w, _ = fr.shape
-        rgb = cv2.cvtColor(fr, cv2.COLOR_BGR2RGB)
-        res = self.hands.process(rgb)
 
         left_found = False
 
         if res.multi_hand_landmarks and res.multi_handedness:
             for lm, hd in zip(res.multi_hand_landmarks, res.multi_handedness):
                 label = hd.classification[0].label
-                ip = lm.landmark[8]  # index tip
-                tp = lm.landmark[4]  # thumb tip
-                ix, iy = int(ip.x*w), int(ip.y*h)
-                tx, ty = int(tp.x*w), int(tp.y*h)
+                _lm_xy(lm, _TIPS, self._lm_buf)
+                tp, ip, mid = self._lm_buf  # thumb, index, middle tips
+                ix, iy = int(ip[0]*w), int(ip[1]*h)
+                tx, ty = int(tp[0]*w), int(tp[1]*h)
 
-                mp.solutions.drawing_utils.draw_landmarks(
-                    fr, lm, mp.solutions.hands.HAND_CONNECTIONS
-                )
+                self._draw_hand(fr, lm, w, h)
 
                 if label == "Left":
                     # move cursor
-                    sx = int(ix * self.screen_w / w)
-                    sy = int(iy * self.screen_h / h)
-                    pyautogui.moveTo(sx, sy)
+                    sx = int(ix * SCREEN_W / w)
+                    sy = int(iy * SCREEN_H / h)
+                    pyautogui.moveTo(sx, sy, _pause=False)
                     cv2.circle(fr, (ix, iy), 10, (0,255,0), -1)
                     left_found = True
                 else:
                     # right hand triggers click and scroll
-                    self.ctrl.update_with_landmarks((tx,ty), (ix,iy), lm)  # Changed from update to update_with_landmarks
+                    self.ctrl.update_with_landmarks((tx,ty), (ix,iy), self._lm_buf)
                     
                     # Draw line between thumb and index (for clicking)
                     clr = (0,0,255) if self.ctrl.down else (0,255,0)
                     cv2.line(fr, (ix,iy), (tx,ty), clr, 3)
                     
                     # Draw line between index and middle finger (for scrolling)
-                    middle_x, middle_y = int(lm.landmark[12].x * w), int(lm.landmark[12].y * h)
-                    scroll_distance = np.hypot(ix - middle_x, iy - middle_y)
-                    scroll_color = (255,0,0) if scroll_distance < 40 else (255,255,0)
+                    middle_x, middle_y = int(mid[0]*w), int(mid[1]*h)
+                    mx, my = ix - middle_x, iy - middle_y
+                    scroll_color = (255,0,0) if mx*mx + my*my < 1600 else (255,255,0)  # 40 px
                     cv2.line(fr, (ix,iy), (middle_x, middle_y), scroll_color, 3)
 
         if not left_found:
             # lift click if no left hand present
-            self.ctrl.update((0,0),(9999,9999))
+            self.ctrl.release()
 
         # display preview
-        h2, w2, _ = fr.shape
-        img = QImage(fr.data, w2, h2, 3*w2, QImage.Format_RGB888).rgbSwapped()
-        self.video.setPixmap(QPixmap.fromImage(img))
+        show_bgr(self.video, fr, self._preview)
 
     def closeEvent(self, event):
         self.stop_tracking()
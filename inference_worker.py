@@ -0,0 +1,175 @@
+# inference_worker.py
+
+import time
+import threading
+import cv2
+import numpy as np
+import pyautogui
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+from PyQt5.QtGui  import QImage, QPixmap
+
+# cursor control runs every frame: no fail‑safe corner. Callers pass _pause=False
+# rather than zeroing pyautogui.PAUSE, which agent.py relies on between keystrokes
+pyautogui.FAILSAFE = False
+SCREEN_W, SCREEN_H = pyautogui.size()
+
+# Qt ≥ 5.14 can wrap OpenCV's BGR frames directly; older Qt needs an RGB copy
+_BGR888 = getattr(QImage, 'Format_BGR888', None)
+
+class PreviewState:
+    """RGB buffer and the QImage bound to it, used by show_bgr on Qt without
+    Format_BGR888. Allocated on the first frame."""
+    def __init__(self):
+        self.rgb  = None
+        self.qimg = None
+
+def show_bgr(label, frame, state):
+    # display a BGR frame on a QLabel without a per-frame QImage copy
+    h, w, _ = frame.shape
+    if _BGR888 is not None:
+        img = QImage(frame.data, w, h, 3*w, _BGR888)
+    else:
+        if state.rgb is None or state.rgb.shape != frame.shape:
+            state.rgb  = np.empty((h,w,3), np.uint8)
+            state.qimg = QImage(state.rgb.data, w, h, 3*w, QImage.Format_RGB888)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=state.rgb)
+        img = state.qimg
+    label.setPixmap(QPixmap.fromImage(img))
+
+class _Relay(QObject):
+    # lives on the GUI thread and hands the worker's newest frame to on_result
+    def __init__(self, worker, on_result, parent):
+        super().__init__(parent)
+        self.worker = worker
+        self.on_result = on_result
+
+    @pyqtSlot()
+    def deliver(self):
+        # a queued `ready` can still arrive after shutdown()
+        out = self.worker.take() if self.worker else None
+        if out:
+            self.on_result(*out)
+
+class InferenceWorker(QObject):
+    """Owns the webcam and a MediaPipe solution, and runs capture + inference
+    off the GUI thread. `start` it from a widget, which then gets the newest
+    (frame, result, fresh) on the GUI thread; `shutdown` stops and frees it."""
+    ready = pyqtSignal()
+
+    def __init__(self, make_model, camera=0, infer_scale=0.5, infer_every=2,
+                 emit_stale=True):
+        super().__init__()
+        self.make_model = make_model  # built inside the worker thread
+        self.camera = camera
+        self.infer_scale = infer_scale  # landmarks are normalised, so this is free
+        self.infer_every = infer_every  # run MediaPipe on every Nth frame only
+        self.emit_stale = emit_stale    # also emit the in-between frames (fresh=False)
+        # True from construction so a stop() that lands before run() sticks
+        self._running = True
+        self._latest = None  # newest captured frame, not yet consumed
+        self._cond = threading.Condition()
+        self._out = None  # newest (frame, result, fresh) the GUI hasn't taken
+        self._out_lock = threading.Lock()
+
+    def _grab(self, cap):
+        # camera I/O on its own thread so decoding overlaps inference;
+        # older frames are simply overwritten
+        while self._running:
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(0.03)
+                continue
+            with self._cond:
+                self._latest = frame
+                self._cond.notify()
+        # released here, by the only thread that reads from it
+        cap.release()
+
+    def _publish(self, frame, res, fresh):
+        # latest-frame slot: overwrite whatever the GUI hasn't taken yet and
+        # only signal when the slot was empty, so at most one event is queued
+        with self._out_lock:
+            prev = self._out
+            # a stale frame carries the same result as the fresh one it replaces
+            self._out = (frame, res, fresh or (prev is not None and prev[2]))
+        if prev is None:
+            self.ready.emit()
+
+    def start(self, parent, on_result):
+        # GUI thread: run on a new QThread. Qt owns both the thread and this
+        # worker from here on; they are deleted once the thread finishes
+        self._relay = _Relay(self, on_result, parent)
+        self._thread = QThread()
+        self.moveToThread(self._thread)
+        self._thread.started.connect(self.run)
+        self.ready.connect(self._relay.deliver)
+        self._thread.finished.connect(self.deleteLater)
+        self._thread.finished.connect(self._thread.deleteLater)
+        sip.transferto(self, None)
+        sip.transferto(self._thread, None)
+        self._thread.start()
+
+    def shutdown(self):
+        # GUI thread: stop, wait for the thread, and drop pending deliveries;
+        # the worker must not be used after this returns
+        self.stop()
+        self._thread.quit()
+        self._thread.wait()
+        self._relay.worker = None
+        self._relay.deleteLater()
+
+    def take(self):
+        # GUI thread: newest (frame, result, fresh), or None if already taken
+        with self._out_lock:
+            out, self._out = self._out, None
+        return out
+
+    @pyqtSlot()
+    def run(self):
+        if not self._running:
+            return
+        cap   = cv2.VideoCapture(self.camera)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # don't queue up stale frames in the driver
+        model = self.make_model()
+        skip, last = 0, None
+        small = rgb = None  # inference buffers, reused every frame
+        grabber = threading.Thread(target=self._grab, args=(cap,), daemon=True)
+        grabber.start()
+        while self._running:
+            with self._cond:
+                while self._latest is None and self._running:
+                    self._cond.wait(0.1)
+                frame, self._latest = self._latest, None
+            if frame is None:
+                continue
+
+            frame = cv2.flip(frame, 1)  # mirror so it feels natural
+            if skip and last is not None:
+                # in-between frame: reuse the previous landmarks
+                skip = (skip+1) % self.infer_every
+                if self.emit_stale:
+                    self._publish(frame, last, False)
+                continue
+
+            if small is None:
+                h, w, _ = frame.shape
+                size  = (int(w*self.infer_scale), int(h*self.infer_scale))
+                small = np.empty((size[1], size[0], 3), np.uint8)
+                rgb   = np.empty_like(small)
+            cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+            last = model.process(rgb)
+            skip = (skip+1) % self.infer_every
+            self._publish(frame, last, True)
+
+        # bounded: cap.read() can block for good if the camera goes away
+        grabber.join(timeout=1.0)
+        model.close()
+
+    def stop(self):
+        # called from the GUI thread; run() checks this once per frame
+        self._running = False